@@ -2,25 +2,73 @@
 Flask Application for Huffman Coding Visualizer and File Compressor
 """
 
+import io
 import os
 import json
+import pathlib
 import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache
 from flask import Flask, render_template, request, send_file, flash, redirect, url_for, jsonify
 from werkzeug.utils import secure_filename
-from huffman import HuffmanCoding, compress_file_content, process_compressed_zip
+from huffman import HuffmanCoding, compress_file_stream, dump_metadata, process_compressed_zip
+
+try:
+    import orjson
+except ImportError:  # orjson is an optional accelerator
+    orjson = None
 
 # Initialize Flask app
 app = Flask(__name__)
 app.secret_key = os.urandom(24)
 
 # Configuration
-UPLOAD_FOLDER = 'uploads'
+UPLOAD_DIR = pathlib.Path('uploads')
 ALLOWED_EXTENSIONS = {'txt', 'pdf', 'png', 'jpg', 'jpeg', 'gif', 'docx', 'csv'}
-app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
+app.config['UPLOAD_FOLDER'] = str(UPLOAD_DIR)
 
 # Ensure the upload folder exists
-if not os.path.exists(UPLOAD_FOLDER):
-    os.makedirs(UPLOAD_FOLDER)
+UPLOAD_DIR.mkdir(exist_ok=True)
+
+# Write size for streaming compressed blobs into zip entries: big enough to
+# amortize syscalls, small enough to stay cache-friendly
+ZIP_WRITE_CHUNK = 1 << 20  # 1 MiB
+
+# Bound worst-case request cost: Werkzeug rejects oversized uploads with
+# 413 before they are read, and the visualizer caps total symbol count so
+# a pathological frequency dict cannot pin a worker
+app.config['MAX_CONTENT_LENGTH'] = 50 * 1024 * 1024
+MAX_SYMBOLS = 10_000_000
+
+# The _compute_codes lru_cache retains codes plus tree JSON per distinct
+# input for the process lifetime, so entry size needs its own bounds:
+# symbols must be single characters and their count is capped, since the
+# total-frequency cap alone does not limit entry size
+MAX_DISTINCT_SYMBOLS = 1024
+
+@lru_cache(maxsize=256)
+def _compute_codes(freq_items, include_tree=True):
+    """Build Huffman codes and tree JSON for a frequency table.
+
+    Keyed on a sorted tuple of (char, freq) pairs so repeat visualizer
+    inputs (demos, tutorials, retries) are served from cache.
+    """
+    if not freq_items:
+        return {}, None
+
+    huffman = HuffmanCoding()
+    huffman.build_from_frequencies(dict(freq_items))
+    return huffman.codes, huffman.get_tree_json() if include_tree else None
+
+
+def _compress_one(content, original_filename):
+    """Compress one uploaded file. Runs in a worker process, so it takes the
+    raw bytes and returns the compressed bytes for the main process to write
+    into the zip."""
+    buf = io.BytesIO()
+    metadata = compress_file_stream(io.BytesIO(content), buf, original_filename)
+    return original_filename, buf.getvalue(), metadata
+
 
 def allowed_file(filename):
     return '.' in filename and \
@@ -39,19 +87,28 @@ def visualizer():
             char_freq_str = request.form.get('char_freq', '{}')
             char_freq = json.loads(char_freq_str)
 
-            if not isinstance(char_freq, dict) or not all(isinstance(k, str) and isinstance(v, int) for k, v in char_freq.items()):
+            if not isinstance(char_freq, dict) or not all(isinstance(k, str) and len(k) == 1 and isinstance(v, int) and v > 0 for k, v in char_freq.items()):
                 raise ValueError("Invalid input format.")
 
-            text = "".join([char * freq for char, freq in char_freq.items()])
+            if len(char_freq) > MAX_DISTINCT_SYMBOLS:
+                return jsonify({'error': 'Too many distinct symbols.'}), 413
 
-            huffman = HuffmanCoding()
-            encoded_text, codes, root = huffman.compress(text)
-            tree_json = huffman.get_tree_json()
+            if sum(char_freq.values()) > MAX_SYMBOLS:
+                return jsonify({'error': 'Total frequency too large.'}), 413
 
-            return jsonify({
+            # Clients that only need the encoding table can skip the tree
+            include_tree = request.form.get('include_tree', '1') != '0'
+            codes, tree_json = _compute_codes(
+                tuple(sorted(char_freq.items())), include_tree)
+
+            payload = {
                 'tree': tree_json,
                 'codes': codes
-            })
+            }
+            if orjson is not None:
+                return app.response_class(orjson.dumps(payload),
+                                          mimetype='application/json')
+            return jsonify(payload)
         except (json.JSONDecodeError, ValueError) as e:
             return jsonify({'error': str(e)}), 400
         except Exception as e:
@@ -72,13 +129,12 @@ def compressor():
             flash('No files selected', 'error')
             return redirect(request.url)
 
+        # Uploads never need to touch disk: Werkzeug already buffers large
+        # request bodies to a spooled temporary file
         uploaded_files = []
         for file in files:
             if file and allowed_file(file.filename):
-                filename = secure_filename(file.filename)
-                filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-                file.save(filepath)
-                uploaded_files.append((filepath, filename))  # Store both path and original filename
+                uploaded_files.append((file, secure_filename(file.filename)))
             else:
                 flash(f'File type not allowed for {file.filename}', 'warning')
 
@@ -86,39 +142,51 @@ def compressor():
             flash('No valid files to compress', 'error')
             return redirect(request.url)
 
-        # Create a zip file to store compressed files
-        zip_filename = 'compressed_files.zip'
-        zip_filepath = os.path.join(app.config['UPLOAD_FOLDER'], zip_filename)
-
         try:
-            with zipfile.ZipFile(zip_filepath, 'w') as zipf:
-                for filepath, original_filename in uploaded_files:
-                    with open(filepath, 'rb') as f:
-                        content = f.read()
-                    
-                    # Pass the original filename to preserve extension
-                    compressed_content, metadata = compress_file_content(content, original_filename)
-                    
-                    # Write compressed data and metadata to the zip
-                    base_filename = os.path.basename(filepath)
-                    zipf.writestr(f'{base_filename}.huf', compressed_content)
-                    zipf.writestr(f'{base_filename}.meta', json.dumps(metadata))
-
-            # Clean up original uploaded files
-            for filepath, _ in uploaded_files:
-                if os.path.exists(filepath):
-                    os.remove(filepath)
-
-            return send_file(zip_filepath, as_attachment=True, download_name=zip_filename)
+            # Assemble the archive in memory; it is sent once and never
+            # needs to exist on disk.
+            # .huf entries are already entropy-coded and near-incompressible,
+            # so pin ZIP_STORED rather than wasting a deflate pass on them
+            zip_buffer = io.BytesIO()
+            with zipfile.ZipFile(zip_buffer, 'w', compression=zipfile.ZIP_STORED,
+                                 allowZip64=True) as zipf:
+                if len(uploaded_files) == 1:
+                    # Single file: compress in-process and stream straight
+                    # into the zip entry, skipping the pool overhead
+                    file, filename = uploaded_files[0]
+                    with zipf.open(f'{filename}.huf', 'w', force_zip64=True) as zf:
+                        metadata = compress_file_stream(file.stream, zf, filename)
+                    zipf.writestr(f'{filename}.meta', dump_metadata(metadata))
+                else:
+                    # Compression is CPU-bound and independent per file, so
+                    # fan out across processes; zipfile is not process-safe,
+                    # so entries are written serially as results arrive
+                    with ProcessPoolExecutor() as executor:
+                        futures = [
+                            executor.submit(_compress_one, file.read(), filename)
+                            for file, filename in uploaded_files
+                        ]
+                        for future in as_completed(futures):
+                            filename, compressed_content, metadata = future.result()
+                            # Feed the entry in bounded chunks rather than
+                            # handing writestr the whole blob to copy at once
+                            with zipf.open(f'{filename}.huf', 'w',
+                                           force_zip64=True) as zf:
+                                view = memoryview(compressed_content)
+                                for i in range(0, len(view), ZIP_WRITE_CHUNK):
+                                    zf.write(view[i:i + ZIP_WRITE_CHUNK])
+                            zipf.writestr(f'{filename}.meta', dump_metadata(metadata))
+
+            zip_buffer.seek(0)
+            return send_file(
+                zip_buffer,
+                mimetype='application/zip',
+                as_attachment=True,
+                download_name='compressed_files.zip'
+            )
 
         except Exception as e:
             flash(f'An error occurred during compression: {str(e)}', 'error')
-            # Clean up in case of error
-            if os.path.exists(zip_filepath):
-                os.remove(zip_filepath)
-            for filepath, _ in uploaded_files:
-                if os.path.exists(filepath):
-                    os.remove(filepath)
             return redirect(request.url)
 
     return render_template('compressor.html')
@@ -143,22 +211,21 @@ def decompressor():
 
         try:
             # Save the uploaded zip file
-            zip_filename = secure_filename(file.filename)
-            zip_filepath = os.path.join(app.config['UPLOAD_FOLDER'], zip_filename)
+            zip_filepath = UPLOAD_DIR / secure_filename(file.filename)
             file.save(zip_filepath)
 
             # Process the zip file
-            decompressed_files = process_compressed_zip(zip_filepath, app.config['UPLOAD_FOLDER'])
+            decompressed_files = process_compressed_zip(zip_filepath, UPLOAD_DIR)
             
             if not decompressed_files:
                 flash('No valid compressed files found in the archive', 'error')
                 return redirect(request.url)
 
-            # Create a zip file for the decompressed files
-            output_zip_filename = 'decompressed_files.zip'
-            output_zip_path = os.path.join(app.config['UPLOAD_FOLDER'], output_zip_filename)
-
-            with zipfile.ZipFile(output_zip_path, 'w') as zipf:
+            # Assemble the output zip in memory
+            # Decompressed output is raw original content, so deflate it
+            zip_buffer = io.BytesIO()
+            with zipfile.ZipFile(zip_buffer, 'w',
+                                 compression=zipfile.ZIP_DEFLATED) as zipf:
                 for item in decompressed_files:
                     # Reconstruct the original filename with extension if available
                     ext = f".{item['original_extension']}" if item['original_extension'] else ''
@@ -173,23 +240,21 @@ def decompressor():
                         zipf.writestr(filename, content)
 
             # Clean up the uploaded zip file
-            if os.path.exists(zip_filepath):
-                os.remove(zip_filepath)
+            zip_filepath.unlink(missing_ok=True)
 
+            zip_buffer.seek(0)
             return send_file(
-                output_zip_path,
+                zip_buffer,
                 as_attachment=True,
-                download_name=output_zip_filename,
+                download_name='decompressed_files.zip',
                 mimetype='application/zip'
             )
 
         except Exception as e:
             flash(f'An error occurred during decompression: {str(e)}', 'error')
-            # Clean up any created files
-            if 'zip_filepath' in locals() and os.path.exists(zip_filepath):
-                os.remove(zip_filepath)
-            if 'output_zip_path' in locals() and os.path.exists(output_zip_path):
-                os.remove(output_zip_path)
+            # Clean up the uploaded zip if it was saved
+            if 'zip_filepath' in locals():
+                zip_filepath.unlink(missing_ok=True)
             return redirect(request.url)
 
     return render_template('decompressor.html')
@@ -7,20 +7,49 @@ import heapq
 from collections import defaultdict, Counter
 import json
 
+try:
+    import orjson
+except ImportError:  # orjson is an optional accelerator
+    orjson = None
+
+try:
+    import numpy as np
+except ImportError:  # numpy is an optional accelerator
+    np = None
+
+try:
+    import huffman_numba as _numba
+except ImportError:  # numba/numpy are optional accelerators
+    _numba = None
+
+try:
+    import huffman_cuda as _cuda
+    if not _cuda.is_available():
+        _cuda = None
+except ImportError:  # CUDA path needs numba with a usable GPU
+    _cuda = None
+
 
 class HuffmanNode:
-    """Node class for Huffman Tree"""
+    """Node class for Huffman Tree
+
+    char holds the symbol: an int byte value (0-255) for file compression,
+    or a str character for text input from the visualizer; None for
+    internal nodes.
+
+    Equality is identity: comparing nodes equal by frequency alone would
+    make unrelated nodes interchangeable in sets/dicts.
+    """
+    __slots__ = ('char', 'freq', 'left', 'right')
+
     def __init__(self, char, freq):
         self.char = char
         self.freq = freq
         self.left = None
         self.right = None
-    
+
     def __lt__(self, other):
         return self.freq < other.freq
-    
-    def __eq__(self, other):
-        return self.freq == other.freq
 
 
 class HuffmanCoding:
@@ -34,13 +63,17 @@ class HuffmanCoding:
     
     def build_frequency_dict(self, text):
         """Build frequency dictionary from text"""
+        if np is not None and isinstance(text, (bytes, bytearray, memoryview)):
+            # Single vectorized C pass instead of a per-byte hash insert
+            counts = np.bincount(np.frombuffer(text, dtype=np.uint8), minlength=256)
+            return {int(i): int(c) for i, c in enumerate(counts) if c}
         return dict(Counter(text))
     
     def build_heap(self, frequency):
         """Build min heap from frequency dictionary"""
-        for char, freq in frequency.items():
-            node = HuffmanNode(char, freq)
-            heapq.heappush(self.heap, node)
+        # Bulk construction + heapify is O(N) vs O(N log N) for repeated pushes
+        self.heap = [HuffmanNode(char, freq) for char, freq in frequency.items()]
+        heapq.heapify(self.heap)
     
     def build_tree(self):
         """Build Huffman tree from heap"""
@@ -58,17 +91,24 @@ class HuffmanCoding:
         return self.root
     
     def build_codes_helper(self, node, current_code):
-        """Helper function to build codes recursively"""
+        """Helper function to build codes iteratively with an explicit stack"""
         if node is None:
             return
-        
-        if node.char is not None:
-            self.codes[node.char] = current_code
-            self.reverse_codes[current_code] = node.char
-            return
-        
-        self.build_codes_helper(node.left, current_code + "0")
-        self.build_codes_helper(node.right, current_code + "1")
+
+        # Track (node, depth, path bits as int) and only materialize the
+        # code string at leaves, avoiding a str allocation per tree edge
+        stack = [(node, len(current_code), int(current_code, 2) if current_code else 0)]
+        while stack:
+            node, depth, bits = stack.pop()
+            if node.char is not None:
+                code = format(bits, f'0{depth}b') if depth else current_code
+                self.codes[node.char] = code
+                self.reverse_codes[code] = node.char
+                continue
+            if node.right is not None:
+                stack.append((node.right, depth + 1, (bits << 1) | 1))
+            if node.left is not None:
+                stack.append((node.left, depth + 1, bits << 1))
     
     def build_codes(self):
         """Build Huffman codes from tree"""
@@ -83,6 +123,36 @@ class HuffmanCoding:
         
         self.build_codes_helper(self.root, "")
     
+    def build_code_table(self, max_bits=32):
+        """Pack the codes into parallel (length, bits) integer tables.
+
+        Only valid for byte symbols (0-255). Returns (code_lens, code_bits)
+        as 256-entry lists, or None when a code exceeds max_bits and cannot
+        be held in a fixed-width integer.
+        """
+        code_lens = [0] * 256
+        code_bits = [0] * 256
+        for symbol, code in self.codes.items():
+            if len(code) > max_bits:
+                return None
+            code_lens[symbol] = len(code)
+            code_bits[symbol] = int(code, 2)
+        return code_lens, code_bits
+
+    def make_canonical(self):
+        """Rewrite the codes in canonical Huffman form (byte symbols only).
+
+        Canonical codes are fully determined by their lengths, so metadata
+        only needs to store a 256-entry length array instead of the code
+        strings. Returns that length array.
+        """
+        code_lens = [0] * 256
+        for symbol, code in self.codes.items():
+            code_lens[symbol] = len(code)
+        self.codes = canonical_codes_from_lengths(code_lens)
+        self.reverse_codes = {code: symbol for symbol, code in self.codes.items()}
+        return code_lens
+
     def encode_text(self, text):
         """Encode text using Huffman codes"""
         encoded = ""
@@ -91,36 +161,47 @@ class HuffmanCoding:
         return encoded
     
     def decode_text(self, encoded_text):
-        """Decode text using Huffman codes"""
-        decoded = ""
-        current_code = ""
-        
+        """Decode text by walking the Huffman tree one bit at a time"""
+        root = build_decode_tree(self.reverse_codes)
+        if root is None:
+            return ""
+
+        decoded = []
+        node = root
         for bit in encoded_text:
-            current_code += bit
-            if current_code in self.reverse_codes:
-                decoded += self.reverse_codes[current_code]
-                current_code = ""
-        
-        return decoded
+            node = node.right if bit == "1" else node.left
+            if node.char is not None:
+                decoded.append(node.char)
+                node = root
+
+        return "".join(decoded)
     
+    def build_from_frequencies(self, frequency):
+        """Build the heap, tree and codes straight from a frequency dict.
+
+        Entry point for callers that already have frequencies (like the
+        visualizer) and never need a text materialized or encoded.
+        """
+        if not frequency:
+            return self.codes
+
+        self.build_heap(frequency)
+        self.build_tree()
+        self.build_codes()
+        return self.codes
+
     def compress(self, text):
         """Complete compression pipeline"""
         if not text:
             return "", {}, None
-        
-        # Build frequency dictionary
+
+        # Build frequency dictionary and derive tree + codes from it
         frequency = self.build_frequency_dict(text)
-        
-        # Build heap and tree
-        self.build_heap(frequency)
-        self.build_tree()
-        
-        # Build codes
-        self.build_codes()
-        
+        self.build_from_frequencies(frequency)
+
         # Encode text
         encoded_text = self.encode_text(text)
-        
+
         return encoded_text, self.codes, self.root
     
     def get_tree_structure(self, node=None, level=0):
@@ -155,110 +236,339 @@ class HuffmanCoding:
         """Get tree structure as JSON for D3.js visualization"""
         if node is None:
             node = self.root
-        
+
         if node is None:
             return None
-        
-        tree_dict = {
-            'name': f"{node.char if node.char else '●'}\n({node.freq})",
-            'char': node.char,
-            'freq': node.freq,
-            'is_leaf': node.char is not None
-        }
-        
-        children = []
-        if node.left:
-            left_child = self.get_tree_json(node.left)
-            if left_child:
+
+        # Iterative post-order build: collect nodes top-down, then
+        # materialize each dict after its children already exist
+        stack = [node]
+        order = []
+        while stack:
+            current = stack.pop()
+            order.append(current)
+            if current.left:
+                stack.append(current.left)
+            if current.right:
+                stack.append(current.right)
+
+        dicts = {}
+        for current in reversed(order):
+            tree_dict = {
+                'name': f"{current.char if current.char else '●'}\n({current.freq})",
+                'char': current.char,
+                'freq': current.freq,
+                'is_leaf': current.char is not None
+            }
+
+            children = []
+            if current.left:
+                left_child = dicts[id(current.left)]
                 left_child['edge_label'] = '0'
                 children.append(left_child)
-        
-        if node.right:
-            right_child = self.get_tree_json(node.right)
-            if right_child:
+            if current.right:
+                right_child = dicts[id(current.right)]
                 right_child['edge_label'] = '1'
                 children.append(right_child)
-        
-        if children:
-            tree_dict['children'] = children
-        
-        return tree_dict
+
+            if children:
+                tree_dict['children'] = children
+
+            dicts[id(current)] = tree_dict
+
+        return dicts[id(node)]
+
+
+# Chunk size for streaming compression: large enough to amortize per-call
+# overhead, small enough to keep the interim bit string off the heap ceiling
+_CHUNK_SIZE = 1 << 22  # 4 MiB
+
+# Precomputed byte -> '01011010' strings: iterating a cached str is cheaper
+# than eight shift/mask operations per byte in the pure-Python decoder
+_BIN_LUT = tuple(format(b, '08b') for b in range(256))
+
+
+def canonical_codes_from_lengths(code_lens):
+    """Reconstruct canonical Huffman codes from a 256-entry length array"""
+    codes = {}
+    code = 0
+    prev_len = 0
+    for length, symbol in sorted(
+            (length, symbol) for symbol, length in enumerate(code_lens) if length):
+        code <<= length - prev_len
+        codes[symbol] = format(code, f'0{length}b')
+        code += 1
+        prev_len = length
+    return codes
+
+
+def dump_metadata(metadata):
+    """Serialize a metadata dict to bytes for a .meta entry"""
+    if orjson is not None:
+        return orjson.dumps(metadata)
+    return json.dumps(metadata).encode('utf-8')
+
+
+def load_metadata(data):
+    """Deserialize .meta entry bytes back to a metadata dict"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def build_decode_tree(reverse_codes):
+    """Rebuild a Huffman tree from a code -> symbol mapping"""
+    if not reverse_codes:
+        return None
+
+    root = HuffmanNode(None, 0)
+    for code, symbol in reverse_codes.items():
+        node = root
+        for bit in code:
+            if bit == "1":
+                if node.right is None:
+                    node.right = HuffmanNode(None, 0)
+                node = node.right
+            else:
+                if node.left is None:
+                    node.left = HuffmanNode(None, 0)
+                node = node.left
+        node.char = symbol
+
+    return root
 
 
 def compress_file_content(content, original_filename=''):
     """
     Compress file content using Huffman coding
-    
+
     Args:
         content: The content to compress (bytes or str)
         original_filename: Original filename (optional, used to determine file type)
     """
     huffman = HuffmanCoding()
-    
+
     is_binary = isinstance(content, bytes)
-    if is_binary:
-        # Convert bytes to string representation
-        content_str = ''.join(chr(b) for b in content)
+    if not is_binary:
+        # Normalize text input to bytes so the whole pipeline works on
+        # byte symbols (0-255) without a per-character round trip
+        content = content.encode('utf-8')
+
+    code_lens = [0] * 256
+    if content:
+        # Count byte frequencies directly on the bytes input
+        frequency = huffman.build_frequency_dict(content)
+        huffman.build_from_frequencies(frequency)
+        code_lens = huffman.make_canonical()
+    codes = huffman.codes
+
+    # Pack codes into (length, bits) integer tables for the JIT kernels
+    code_table = huffman.build_code_table() if content else None
+    if (_cuda is not None and code_table is not None
+            and len(content) >= _cuda.MIN_GPU_BYTES):
+        compressed_bytes, padding = _cuda.encode(content, *code_table)
+    elif _numba is not None and code_table is not None:
+        compressed_bytes, padding = _numba.encode(content, *code_table)
     else:
-        content_str = content
-    
-    encoded, codes, root = huffman.compress(content_str)
-    
-    # Convert encoded string to bytes
-    # Pad to make it byte-aligned
-    padding = 8 - len(encoded) % 8
-    if padding != 8:  # Only add padding if needed
-        encoded += '0' * padding
-    
-    # Convert binary string to bytes
-    compressed_bytes = bytearray()
-    for i in range(0, len(encoded), 8):
-        byte = encoded[i:i+8]
-        compressed_bytes.append(int(byte, 2))
-    
+        # Precompute a 256-entry lookup table so encoding is a single
+        # C-level join instead of a per-character dict lookup loop
+        code_table = [codes.get(b, '') for b in range(256)]
+        encoded = ''.join(map(code_table.__getitem__, content))
+
+        # Pad to make it byte-aligned
+        padding = -len(encoded) % 8
+        if padding:
+            encoded += '0' * padding
+
+        # Convert binary string to bytes in one C call
+        if encoded:
+            compressed_bytes = int(encoded, 2).to_bytes(len(encoded) // 8, 'big')
+        else:
+            compressed_bytes = b''
+
     # Get file extension if available
     original_extension = ''
     if original_filename and '.' in original_filename:
         original_extension = original_filename.rsplit('.', 1)[1].lower()
-    
-    # Store metadata
+
+    # Store metadata: canonical codes are reconstructed from lengths alone
     metadata = {
-        'codes': codes,
+        'lens': code_lens,
         'padding': padding,
-        'original_size': len(content_str),
+        'original_size': len(content),
         'is_binary': is_binary,
         'original_extension': original_extension
     }
-    
-    return bytes(compressed_bytes), metadata
+
+    return compressed_bytes, metadata
+
+
+def compress_file_stream(fileobj, out, original_filename='', chunk_size=_CHUNK_SIZE):
+    """
+    Compress a seekable binary stream using Huffman coding
+
+    Reads the stream twice in fixed-size chunks: once to count frequencies,
+    once to encode, so the full input and the full bit string never sit in
+    memory at the same time. Packed bytes are written to the out file-like
+    object as they are produced.
+
+    Args:
+        fileobj: Seekable binary stream to compress
+        out: Writable binary file-like object for the compressed bytes
+        original_filename: Original filename (optional, used to determine file type)
+        chunk_size: Read size per chunk in bytes
+
+    Returns the metadata dict needed for decompression.
+    """
+    huffman = HuffmanCoding()
+
+    # Pass 1: count frequencies chunk by chunk
+    if np is not None:
+        counts = np.zeros(256, dtype=np.int64)
+    else:
+        counts = Counter()
+    original_size = 0
+    while True:
+        chunk = fileobj.read(chunk_size)
+        if not chunk:
+            break
+        original_size += len(chunk)
+        if np is not None:
+            counts += np.bincount(np.frombuffer(chunk, dtype=np.uint8), minlength=256)
+        else:
+            counts.update(chunk)
+    if np is not None:
+        frequency = {int(i): int(c) for i, c in enumerate(counts) if c}
+    else:
+        frequency = dict(counts)
+
+    code_lens = [0] * 256
+    if frequency:
+        huffman.build_from_frequencies(frequency)
+        code_lens = huffman.make_canonical()
+    codes = huffman.codes
+
+    # Pass 2: encode chunk by chunk, carrying the sub-byte residual between
+    # chunks so every write except the last is byte-aligned
+    fileobj.seek(0)
+    packed = huffman.build_code_table() if frequency else None
+    padding = 0
+    if _numba is not None and packed is not None:
+        # JIT kernel path: the accumulator carries the residual bits
+        acc = 0
+        nbits = 0
+        while True:
+            chunk = fileobj.read(chunk_size)
+            if not chunk:
+                break
+            encoded, acc, nbits = _numba.encode_chunk(chunk, *packed, acc, nbits)
+            out.write(encoded)
+        tail, padding = _numba.flush(acc, nbits)
+        if tail:
+            out.write(tail)
+    else:
+        code_table = [codes.get(b, '') for b in range(256)]
+        residual = ''
+        while True:
+            chunk = fileobj.read(chunk_size)
+            if not chunk:
+                break
+            bits = residual + ''.join(map(code_table.__getitem__, chunk))
+            aligned = len(bits) // 8 * 8
+            if aligned:
+                out.write(int(bits[:aligned], 2).to_bytes(aligned // 8, 'big'))
+            residual = bits[aligned:]
+
+        padding = -len(residual) % 8
+        if residual:
+            out.write(int(residual + '0' * padding, 2).to_bytes(1, 'big'))
+
+    original_extension = ''
+    if original_filename and '.' in original_filename:
+        original_extension = original_filename.rsplit('.', 1)[1].lower()
+
+    return {
+        'lens': code_lens,
+        'padding': padding,
+        'original_size': original_size,
+        'is_binary': True,
+        'original_extension': original_extension
+    }
+
+
+def _decode_symbols(compressed_bytes, total_bits, root):
+    """Walk the decode tree bit by bit over the compressed bytes: one
+    pointer step per bit instead of a growing prefix string + dict lookup.
+    Returns the list of decoded symbols."""
+    decoded = []
+    if root is None:
+        return decoded
+
+    node = root
+    bits_left = total_bits
+    for byte in compressed_bytes:
+        bits = _BIN_LUT[byte]
+        if bits_left < 8:
+            bits = bits[:bits_left]
+        for bit in bits:
+            node = node.right if bit == "1" else node.left
+            if node.char is not None:
+                decoded.append(node.char)
+                node = root
+        bits_left -= 8
+    return decoded
 
 
 def decompress_file_content(compressed_bytes, metadata):
     """Decompress file content using Huffman coding"""
-    # Convert bytes back to binary string
-    binary_str = ''.join(format(byte, '08b') for byte in compressed_bytes)
-    
-    # Remove padding
-    binary_str = binary_str[:-metadata['padding']]
-    
-    # Decode using reverse codes
-    huffman = HuffmanCoding()
-    huffman.reverse_codes = {v: k for k, v in metadata['codes'].items()}
-    
-    # Convert the decoded characters back to bytes
-    decoded_text = huffman.decode_text(binary_str)
-    
-    # Convert the decoded text (characters) back to bytes
-    if isinstance(metadata.get('is_binary', False), bool) and metadata['is_binary']:
-        try:
-            # For binary files, convert each character code back to byte
-            decoded_bytes = bytes(ord(c) for c in decoded_text)
-            return decoded_bytes
-        except Exception as e:
-            raise ValueError(f"Error converting decoded text to bytes: {e}")
-    
-    # For text files, return as is
-    return decoded_text
+    is_binary = metadata.get('is_binary', False)
+    total_bits = len(compressed_bytes) * 8 - metadata['padding']
+
+    if 'lens' in metadata:
+        codes = canonical_codes_from_lengths(metadata['lens'])
+        reverse_codes = {code: symbol for symbol, code in codes.items()}
+    else:
+        # Legacy metadata with explicit code strings. The interim
+        # byte-symbol format wrote int (or digit-string, after a JSON
+        # round trip) keys; baseline archives stored raw characters.
+        # Baseline keys are always single characters while interim keys
+        # are multi-character for any byte >= 10, so all-single-digit
+        # keys must mean baseline digit text, not interim symbols
+        legacy_codes = metadata['codes']
+        keys = list(legacy_codes)
+        if all(isinstance(s, int) for s in keys) or (
+                all(isinstance(s, str) and s.isascii() and s.isdigit()
+                    for s in keys)
+                and any(len(s) > 1 for s in keys)):
+            reverse_codes = {code: int(symbol)
+                             for symbol, code in legacy_codes.items()}
+        else:
+            # Baseline archives: decode to characters, then recover bytes
+            # via ord() for binary files, matching the old chr() round trip
+            reverse_codes = {code: symbol
+                             for symbol, code in legacy_codes.items()}
+            symbols = _decode_symbols(compressed_bytes, total_bits,
+                                      build_decode_tree(reverse_codes))
+            if is_binary:
+                return bytes(ord(c) for c in symbols)
+            return ''.join(symbols)
+
+    if _numba is not None and reverse_codes:
+        decoded = _numba.decode(
+            compressed_bytes, reverse_codes, metadata['padding'],
+            metadata['original_size'])
+        if is_binary:
+            return decoded
+        return decoded.decode('utf-8')
+
+    root = build_decode_tree(reverse_codes)
+    decoded = bytearray(_decode_symbols(compressed_bytes, total_bits, root))
+
+    if is_binary:
+        return bytes(decoded)
+
+    # For text files, decode back to str
+    return decoded.decode('utf-8')
 
 def process_compressed_zip(zip_path, extract_to):
     """
@@ -294,8 +604,8 @@ def process_compressed_zip(zip_path, extract_to):
                     
                     try:
                         # Read metadata
-                        with open(meta_path, 'r') as f:
-                            metadata = json.load(f)
+                        with open(meta_path, 'rb') as f:
+                            metadata = load_metadata(f.read())
                         
                         # Read compressed content
                         with open(huf_path, 'rb') as f:
@@ -0,0 +1,76 @@
+"""
+Optional CUDA kernel for Huffman encoding
+Used by huffman.py for large inputs when a CUDA-capable GPU is present;
+the Numba CPU kernel and pure-Python paths remain the fallbacks
+"""
+
+import numpy as np
+from numba import cuda
+
+# Below this size kernel-launch and transfer overhead outweighs the win
+MIN_GPU_BYTES = 1 << 20
+
+
+def is_available():
+    """Report whether a usable CUDA device is present"""
+    try:
+        return cuda.is_available()
+    except Exception:
+        return False
+
+
+@cuda.jit
+def _scatter_bits_kernel(data, code_lens, code_bits, bit_offsets, out_words):
+    """One thread per input byte: OR its code bits into the output stream.
+
+    out_words is a uint32 array holding the bit stream in conceptual
+    big-endian order (byte k of the stream is byte k % 4 from the top of
+    word k // 4); atomics are word-wide because CUDA has no byte atomics.
+    """
+    i = cuda.grid(1)
+    if i >= data.size:
+        return
+
+    byte = data[i]
+    length = code_lens[byte]
+    bits = code_bits[byte]
+    offset = bit_offsets[i]
+    for j in range(length):
+        if (bits >> (length - 1 - j)) & 1:
+            pos = offset + j
+            shift = ((3 - ((pos >> 3) & 3)) << 3) | (7 - (pos & 7))
+            cuda.atomic.or_(out_words, pos >> 5, np.uint32(1) << shift)
+
+
+def encode(content, code_lens, code_bits):
+    """Encode bytes content on the GPU using packed (length, bits) tables.
+
+    Returns (compressed_bytes, padding).
+    """
+    data = np.frombuffer(content, dtype=np.uint8)
+    code_lens = np.asarray(code_lens, dtype=np.uint8)
+    code_bits = np.asarray(code_bits, dtype=np.uint32)
+
+    # Per-byte bit offsets via prefix sum; the scan is memory-bound and
+    # cheap on the host compared to the scatter itself
+    per_byte = code_lens[data].astype(np.int64)
+    bit_offsets = np.zeros(len(data), dtype=np.int64)
+    np.cumsum(per_byte[:-1], out=bit_offsets[1:])
+    total_bits = int(bit_offsets[-1] + per_byte[-1])
+    padding = -total_bits % 8
+
+    out_words = cuda.to_device(np.zeros((total_bits + 31) // 32, dtype=np.uint32))
+    threads = 256
+    blocks = (len(data) + threads - 1) // threads
+    _scatter_bits_kernel[blocks, threads](
+        cuda.to_device(data),
+        cuda.to_device(code_lens),
+        cuda.to_device(code_bits),
+        cuda.to_device(bit_offsets),
+        out_words,
+    )
+
+    # byteswap turns the native little-endian words into the big-endian
+    # byte order the kernel assumed
+    stream = out_words.copy_to_host().byteswap().tobytes()
+    return stream[:(total_bits + padding) // 8], padding
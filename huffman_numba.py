@@ -0,0 +1,136 @@
+"""
+Numba-accelerated kernels for Huffman encoding and decoding
+Optional module: huffman.py falls back to pure Python when numba/numpy
+are not installed
+"""
+
+import numpy as np
+from numba import njit
+
+
+@njit(cache=True)
+def _encode_kernel(data, code_lens, code_bits, out, acc, nbits):
+    """Pack Huffman codes for each input byte into the output buffer.
+
+    Takes and returns the (acc, nbits) bit accumulator so callers can
+    carry the sub-byte residual across chunks of a stream. Returns
+    (bytes_written, acc, nbits); nbits is always < 8 on return.
+    """
+    pos = 0
+    for b in data:
+        acc = (acc << np.uint64(code_lens[b])) | np.uint64(code_bits[b])
+        nbits += code_lens[b]
+        while nbits >= 8:
+            nbits -= 8
+            out[pos] = (acc >> np.uint64(nbits)) & np.uint64(0xFF)
+            pos += 1
+    return pos, acc, nbits
+
+
+@njit(cache=True)
+def _decode_kernel(data, total_bits, left, right, symbol, out):
+    """Walk the flattened Huffman tree over the compressed bits.
+
+    Returns the number of decoded bytes written to out.
+    """
+    node = 0
+    pos = 0
+    bit_index = 0
+    for byte in data:
+        for i in range(8):
+            if bit_index >= total_bits:
+                break
+            if (byte >> (7 - i)) & 1:
+                node = right[node]
+            else:
+                node = left[node]
+            if symbol[node] >= 0:
+                if pos >= out.size:
+                    return pos
+                out[pos] = symbol[node]
+                pos += 1
+                node = 0
+            bit_index += 1
+    return pos
+
+
+def encode_chunk(content, code_lens, code_bits, acc=0, nbits=0):
+    """Encode one chunk of bytes using packed 256-entry (length, bits) tables.
+
+    acc/nbits carry the sub-byte residual from the previous chunk; pass the
+    returned pair into the next call and finish the stream with flush().
+    Returns (compressed_bytes, acc, nbits).
+    """
+    max_len = max(code_lens)
+    code_lens = np.asarray(code_lens, dtype=np.uint8)
+    code_bits = np.asarray(code_bits, dtype=np.uint32)
+
+    data = np.frombuffer(content, dtype=np.uint8)
+    # Worst case: max_len bits per input byte, plus one byte of slack
+    out = np.empty(len(data) * ((max_len + 7) // 8 + 1) + 1, dtype=np.uint8)
+    pos, acc, nbits = _encode_kernel(data, code_lens, code_bits, out,
+                                     np.uint64(acc), np.int64(nbits))
+    return out[:pos].tobytes(), int(acc), int(nbits)
+
+
+def flush(acc, nbits):
+    """Pad the residual accumulator bits out to a final byte.
+
+    Returns (tail_bytes, padding).
+    """
+    if not nbits:
+        return b'', 0
+    padding = 8 - nbits
+    return bytes([(acc << padding) & 0xFF]), padding
+
+
+def encode(content, code_lens, code_bits):
+    """Encode bytes content using packed 256-entry (length, bits) tables.
+
+    Returns (compressed_bytes, padding).
+    """
+    encoded, acc, nbits = encode_chunk(content, code_lens, code_bits)
+    tail, padding = flush(acc, nbits)
+    return encoded + tail, padding
+
+
+def decode(compressed_bytes, reverse_codes, padding, original_size):
+    """Decode compressed bytes using a {bit-string: byte} code table.
+
+    Returns the decoded bytes.
+    """
+    # Flatten the decode tree into parallel child/symbol arrays: node 0 is
+    # the root, -1 marks a missing child or an internal node's symbol
+    num_nodes = 1
+    left = [-1]
+    right = [-1]
+    symbol = [-1]
+    for code, sym in reverse_codes.items():
+        node = 0
+        for bit in code:
+            children = right if bit == "1" else left
+            if children[node] < 0:
+                children[node] = num_nodes
+                left.append(-1)
+                right.append(-1)
+                symbol.append(-1)
+                num_nodes += 1
+            node = children[node]
+        symbol[node] = sym
+
+    data = np.frombuffer(compressed_bytes, dtype=np.uint8)
+    total_bits = len(data) * 8 - padding
+    # Metadata is untrusted: each decoded symbol consumes at least one bit,
+    # so the stream can never yield more than total_bits symbols regardless
+    # of what original_size claims
+    out = np.empty(min(max(int(original_size), 0), max(total_bits, 0)),
+                   dtype=np.uint8)
+    pos = _decode_kernel(
+        data,
+        total_bits,
+        np.asarray(left, dtype=np.int32),
+        np.asarray(right, dtype=np.int32),
+        np.asarray(symbol, dtype=np.int16),
+        out,
+    )
+    return out[:pos].tobytes()